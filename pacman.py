@@ -1,15 +1,36 @@
+from __future__ import annotations
+
 import sys
-import math
-import random
+import time
+import numpy as np
 import pygame
-from dataclasses import dataclass
-from typing import List, Tuple, Set, Optional
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional; fall back to plain Python
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
 
 # -----------------------------
 # Config & Constants
 # -----------------------------
-TILE_SIZE = 24
-FPS = 60
+# Positions are fixed-point ints in pixels (1/TILE_SIZE of a tile), so TILE_SIZE
+# must be a power of two: tile index is a shift and tile-center test is a mask
+TILE_SHIFT = 5
+TILE_SIZE = 1 << TILE_SHIFT
+TILE_MASK = TILE_SIZE - 1
+TILE_HALF = TILE_SIZE // 2
+FPS = 60  # simulation steps per second
+STEP = 1.0 / FPS
+MAX_RENDER_FPS = 120  # render throttle; rendering is decoupled from simulation
+MAX_STEPS_PER_FRAME = 5  # drop simulation time rather than spiral when far behind
+# Squared pixel distance below which the player and a ghost collide
+COLLIDE_DIST2 = (TILE_SIZE * 0.6) ** 2
 
 # Colors
 BLACK = (0, 0, 0)
@@ -35,33 +56,79 @@ LEFT = (-1, 0)
 RIGHT = (1, 0)
 STOP = (0, 0)
 ALL_DIRS = [UP, DOWN, LEFT, RIGHT]
+# Arrow key -> direction, applied on KEYDOWN events
+DIR_MAP = {pygame.K_UP: UP, pygame.K_DOWN: DOWN, pygame.K_LEFT: LEFT, pygame.K_RIGHT: RIGHT}
+
+# Exit bitmask bits, one per entry of ALL_DIRS (bit0=UP, bit1=DOWN, bit2=LEFT, bit3=RIGHT)
+EXIT_BITS = [1 << i for i in range(len(ALL_DIRS))]
+POPCOUNT4 = [bin(m).count('1') for m in range(16)]
+
+# Distance field value for tiles that can't reach the target
+DIST_UNREACHABLE = np.iinfo(np.int16).max
+
+# Item grid codes
+ITEM_NONE = 0
+ITEM_PELLET = 1
+ITEM_POWER = 2
 
 
 # -----------------------------
 # Maze
 # -----------------------------
 class Maze:
-    def __init__(self, layout: List[str]):
+    __slots__ = ('layout', 'height', 'width', 'player_start', 'ghost_starts', 'house_pos',
+                 'wall_grid', 'item_grid', 'wall_rows', 'item_rows', 'pellet_count', 'power_count', 'remaining',
+                 'exits', 'house_field',
+                 'wall_rects', 'pellet_px', 'power_px', 'bg_surface', 'pellet_sprite', 'power_sprite',
+                 'pellets_surface', 'dirty_rects')
+
+    def __init__(self, layout: list[str]):
         self.layout = layout
         self.height = len(layout)
         self.width = len(layout[0]) if self.height > 0 else 0
-        self.walls: Set[Tuple[int, int]] = set()
-        self.pellets: Set[Tuple[int, int]] = set()
-        self.power_pellets: Set[Tuple[int, int]] = set()
-        self.player_start: Tuple[int, int] = (1, 1)
-        self.ghost_starts: List[Tuple[int, int]] = []
-        self.house_pos: Tuple[int, int] = (self.width // 2, self.height // 2)
+        self.player_start: tuple[int, int] = (1, 1)
+        self.ghost_starts: list[tuple[int, int]] = []
+        self.house_pos: tuple[int, int] = (self.width // 2, self.height // 2)
+        # wall_grid[y, x] is True for wall tiles
+        self.wall_grid = np.zeros((self.height, self.width), dtype=np.bool_)
+        # item_grid[y, x] holds ITEM_NONE / ITEM_PELLET / ITEM_POWER
+        self.item_grid = np.zeros((self.height, self.width), dtype=np.uint8)
+        # Nested-list copies (rows[y][x]) for per-frame Python lookups, which are
+        # cheaper than NumPy scalar indexing; filled once _parse has run
+        self.wall_rows: list[list[bool]] = []
+        self.item_rows: list[list[int]] = []
+        self.pellet_count = 0
+        self.power_count = 0
+        # exits[y, x] is a bitmask of passable neighbor directions (see EXIT_BITS)
+        self.exits = np.zeros((self.height, self.width), dtype=np.uint8)
+        # Pixel-space geometry collected in _parse: wall tile rects and pellet tile top-lefts
+        self.wall_rects: list[pygame.Rect] = []
+        self.pellet_px: list[tuple[int, int]] = []
+        self.power_px: list[tuple[int, int]] = []
+        # Cached surfaces, built by prerender() once a display mode is set
+        self.bg_surface: pygame.Surface | None = None
+        self.pellet_sprite: pygame.Surface | None = None
+        self.power_sprite: pygame.Surface | None = None
+        self.pellets_surface: pygame.Surface | None = None
+        # Screen areas changed since the last frame (eaten pellets)
+        self.dirty_rects: list[pygame.Rect] = []
         self._parse()
 
     def _parse(self):
         for y, row in enumerate(self.layout):
             for x, ch in enumerate(row):
+                px, py = x * TILE_SIZE, y * TILE_SIZE
                 if ch == '#':
-                    self.walls.add((x, y))
+                    self.wall_grid[y, x] = True
+                    self.wall_rects.append(pygame.Rect(px, py, TILE_SIZE, TILE_SIZE))
                 elif ch == '.':
-                    self.pellets.add((x, y))
+                    self.item_grid[y, x] = ITEM_PELLET
+                    self.pellet_count += 1
+                    self.pellet_px.append((px, py))
                 elif ch == 'o':
-                    self.power_pellets.add((x, y))
+                    self.item_grid[y, x] = ITEM_POWER
+                    self.power_count += 1
+                    self.power_px.append((px, py))
                 elif ch == 'P':
                     self.player_start = (x, y)
                 elif ch == 'C':
@@ -72,157 +139,368 @@ class Maze:
                     self.ghost_starts.append((x, y))
                 elif ch == 'H':
                     self.house_pos = (x, y)
+        self.remaining = self.pellet_count + self.power_count
+        self.wall_rows = self.wall_grid.tolist()
+        self.item_rows = self.item_grid.tolist()
+
+        # Exits need the full wall grid, so fill them in a second pass
+        for y in range(self.height):
+            for x in range(self.width):
+                mask = 0
+                for (dx, dy), bit in zip(ALL_DIRS, EXIT_BITS):
+                    if self.passable(x + dx, y + dy):
+                        mask |= bit
+                self.exits[y, x] = mask
+
+        # Eaten ghosts always head home, so the house field never changes
+        self.house_field = self.compute_distance_field(self.house_pos)
 
     def in_bounds(self, gx: int, gy: int) -> bool:
         return 0 <= gx < self.width and 0 <= gy < self.height
 
     def passable(self, gx: int, gy: int) -> bool:
-        return (gx, gy) not in self.walls
+        # Out-of-bounds tiles are treated as impassable
+        return 0 <= gx < self.width and 0 <= gy < self.height and not self.wall_rows[gy][gx]
+
+    def compute_distance_field(self, target: tuple[int, int]) -> np.ndarray:
+        # BFS step distance from every tile to target over passable tiles
+        return distance_field(self.exits, target[0], target[1])
 
     def is_intersection(self, gx: int, gy: int) -> bool:
         # Intersection if more than 2 valid neighbors
-        valid = 0
-        for dx, dy in ALL_DIRS:
-            nx, ny = gx + dx, gy + dy
-            if self.in_bounds(nx, ny) and self.passable(nx, ny):
-                valid += 1
-        return valid >= 3
+        if not self.in_bounds(gx, gy):
+            return False
+        return POPCOUNT4[self.exits[gy, gx]] >= 3
+
+    def prerender(self):
+        # Render static walls/floor and pellet sprites once (requires a display mode)
+        self.bg_surface = pygame.Surface((self.width * TILE_SIZE, self.height * TILE_SIZE)).convert()
+        self.bg_surface.fill(BLACK)
+        fill = self.bg_surface.fill
+        for rect in self.wall_rects:
+            fill(NAVY, rect)
+            pygame.draw.rect(self.bg_surface, BLUE, rect, 2)
+
+        center = (TILE_SIZE // 2, TILE_SIZE // 2)
+        self.pellet_sprite = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA).convert_alpha()
+        pygame.draw.circle(self.pellet_sprite, WHITE, center, 3)
+        self.power_sprite = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA).convert_alpha()
+        pygame.draw.circle(self.power_sprite, WHITE, center, 6, 2)
+
+        # Overlay with every remaining pellet, used only for the initial composite
+        # (Game.background); eaten tiles are repaired from bg_surface afterwards
+        size = (self.width * TILE_SIZE, self.height * TILE_SIZE)
+        self.pellets_surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        self.pellets_surface.fill((0, 0, 0, 0))
+        blit = self.pellets_surface.blit
+        item_grid = self.item_grid
+        for sprite, positions in ((self.pellet_sprite, self.pellet_px), (self.power_sprite, self.power_px)):
+            for pos in positions:
+                if item_grid[pos[1] >> TILE_SHIFT, pos[0] >> TILE_SHIFT]:
+                    blit(sprite, pos)
+
+    def clear_pellet_px(self, gx: int, gy: int):
+        # Queue an eaten pellet's tile for Game.draw to repaint from bg_surface
+        self.dirty_rects.append(pygame.Rect(gx * TILE_SIZE, gy * TILE_SIZE, TILE_SIZE, TILE_SIZE))
 
     def draw(self, screen: pygame.Surface):
-        # Draw walls and pellets
-        for y, row in enumerate(self.layout):
-            for x, ch in enumerate(row):
-                rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-                if (x, y) in self.walls:
-                    pygame.draw.rect(screen, NAVY, rect)
-                    pygame.draw.rect(screen, BLUE, rect, 2)
-                else:
-                    # Floor
-                    pygame.draw.rect(screen, BLACK, rect)
-
-        # Pellets
-        for (x, y) in self.pellets:
-            cx = x * TILE_SIZE + TILE_SIZE // 2
-            cy = y * TILE_SIZE + TILE_SIZE // 2
-            pygame.draw.circle(screen, WHITE, (cx, cy), 3)
-        # Power Pellets
-        for (x, y) in self.power_pellets:
-            cx = x * TILE_SIZE + TILE_SIZE // 2
-            cy = y * TILE_SIZE + TILE_SIZE // 2
-            pygame.draw.circle(screen, WHITE, (cx, cy), 6, 2)
+        # Draws the initial board; eaten pellets are tracked via dirty_rects, not the overlay
+        if self.bg_surface is None:
+            self.prerender()
+        screen.blit(self.bg_surface, (0, 0))
+        screen.blit(self.pellets_surface, (0, 0))
 
 
 # -----------------------------
 # Utility
 # -----------------------------
 
-def grid_to_px(pos: Tuple[float, float]) -> Tuple[int, int]:
-    x, y = pos
-    return int(x * TILE_SIZE + TILE_SIZE / 2), int(y * TILE_SIZE + TILE_SIZE / 2)
+def tile_of(ipos: list[int]) -> tuple[int, int]:
+    # Nearest tile to a fixed-point position (equals ipos >> TILE_SHIFT at tile centers)
+    return (ipos[0] + TILE_HALF) >> TILE_SHIFT, (ipos[1] + TILE_HALF) >> TILE_SHIFT
 
 
-def manhattan(a: Tuple[int, int], b: Tuple[int, int]) -> int:
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+def circle_sprite(color: tuple[int, int, int], radius: int) -> pygame.Surface:
+    # Tile-sized sprite image with a filled circle at its center (requires a display mode)
+    surf = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA).convert_alpha()
+    surf.fill((0, 0, 0, 0))
+    pygame.draw.circle(surf, color, (TILE_HALF, TILE_HALF), radius)
+    return surf
+
+
+# Span of buffered random ints; divisible by 1..4 so `r % n` is unbiased for any exit count
+RAND_SPAN = 12
+
+
+class RandBuffer:
+    # Pre-generated uniform ints read with a rolling index, instead of a Python RNG call per draw
+    __slots__ = ('buf', 'mask', 'i')
+
+    def __init__(self, size_shift: int = 16, seed: int | None = None):
+        size = 1 << size_shift
+        # Python ints: indexing a list is cheaper than indexing a NumPy array per draw
+        self.buf = np.random.default_rng(seed).integers(0, RAND_SPAN, size=size).tolist()
+        self.mask = size - 1
+        self.i = 0
+
+    def randbelow(self, n: int) -> int:
+        # Uniform int in [0, n) for 1 <= n <= 4
+        i = self.i
+        self.i = (i + 1) & self.mask
+        return self.buf[i] % n
+
+
+RNG = RandBuffer()
+
+
+# -----------------------------
+# Ghost AI kernels (AOT-compiled from pacman_ai.pyx when it has been built,
+# else JIT-compiled when numba is available, else plain Python)
+# -----------------------------
+# Same order as ALL_DIRS / EXIT_BITS
+_DIR_DX = (0, 0, -1, 1)
+_DIR_DY = (-1, 1, 0, 0)
+
+try:
+    # Prebuilt with `python setup.py build_ext --inplace`
+    from pacman_ai import valid_neighbors_mask, choose_dir, choose_dir_field, pick_exit, distance_field
+except ImportError:
+    @njit(cache=True)
+    def valid_neighbors_mask(exits, gx, gy, cur_dx, cur_dy, avoid_reverse):
+        # Exit bitmask at (gx, gy), optionally without the bit that reverses (cur_dx, cur_dy)
+        if gy < 0 or gy >= exits.shape[0] or gx < 0 or gx >= exits.shape[1]:
+            return 0
+        mask = int(exits[gy, gx])
+        if avoid_reverse:
+            for i in range(4):
+                if _DIR_DX[i] == -cur_dx and _DIR_DY[i] == -cur_dy:
+                    mask &= ~(1 << i)
+        return mask
+
+    @njit(cache=True)
+    def choose_dir(gx, gy, cur_dx, cur_dy, tgt_x, tgt_y, exits_mask):
+        # Greedy choose the direction in exits_mask minimizing Manhattan distance to target
+        best_dx, best_dy = cur_dx, cur_dy
+        best_dist = -1
+        for i in range(4):
+            if exits_mask & (1 << i):
+                dist = abs(gx + _DIR_DX[i] - tgt_x) + abs(gy + _DIR_DY[i] - tgt_y)
+                if best_dist < 0 or dist < best_dist:
+                    best_dist = dist
+                    best_dx, best_dy = _DIR_DX[i], _DIR_DY[i]
+        return best_dx, best_dy
+
+    @njit(cache=True)
+    def choose_dir_field(gx, gy, cur_dx, cur_dy, field, exits_mask, maximize):
+        # Choose the direction in exits_mask with the lowest (or highest) distance field value
+        best_dx, best_dy = cur_dx, cur_dy
+        found = False
+        best_dist = 0
+        for i in range(4):
+            if exits_mask & (1 << i):
+                dist = int(field[gy + _DIR_DY[i], gx + _DIR_DX[i]])
+                if not found or (dist > best_dist if maximize else dist < best_dist):
+                    found = True
+                    best_dist = dist
+                    best_dx, best_dy = _DIR_DX[i], _DIR_DY[i]
+        return best_dx, best_dy
+
+    @njit(cache=True)
+    def pick_exit(exits_mask, k):
+        # Direction of the k-th set bit in exits_mask (no list allocation)
+        for i in range(4):
+            if exits_mask & (1 << i):
+                if k == 0:
+                    return _DIR_DX[i], _DIR_DY[i]
+                k -= 1
+        return 0, 0
+
+    if HAVE_NUMBA:
+        @njit(cache=True)
+        def distance_field(exits, tx, ty):
+            # BFS step distance to (tx, ty) along the exit masks; DIST_UNREACHABLE elsewhere
+            h, w = exits.shape
+            field = np.full((h, w), DIST_UNREACHABLE, dtype=np.int16)
+            if ty < 0 or ty >= h or tx < 0 or tx >= w:
+                return field
+            # Flat y * w + x queue; every tile is enqueued at most once
+            queue = np.empty(h * w, dtype=np.int32)
+            field[ty, tx] = 0
+            queue[0] = ty * w + tx
+            head, tail = 0, 1
+            while head < tail:
+                y, x = divmod(queue[head], w)
+                head += 1
+                mask = exits[y, x]
+                nd = field[y, x] + 1
+                for i in range(4):
+                    if mask & (1 << i):
+                        nx, ny = x + _DIR_DX[i], y + _DIR_DY[i]
+                        if field[ny, nx] == DIST_UNREACHABLE:
+                            field[ny, nx] = nd
+                            queue[tail] = ny * w + nx
+                            tail += 1
+            return field
+    else:
+        def distance_field(exits, tx, ty):
+            # Same BFS on flat Python lists: per-element NumPy indexing is slow
+            # without a JIT (and on PyPy)
+            h, w = exits.shape
+            if ty < 0 or ty >= h or tx < 0 or tx >= w:
+                return np.full((h, w), DIST_UNREACHABLE, dtype=np.int16)
+            masks = exits.ravel().tolist()
+            field = [DIST_UNREACHABLE] * (h * w)
+            steps = (-w, w, -1, 1)  # flat offsets in _DIR_DX / _DIR_DY order
+            start = ty * w + tx
+            field[start] = 0
+            queue = [start]
+            for cell in queue:  # grows while iterating; each tile is appended once
+                mask = masks[cell]
+                nd = field[cell] + 1
+                for i in range(4):
+                    if mask & (1 << i):
+                        n = cell + steps[i]
+                        if field[n] == DIST_UNREACHABLE:
+                            field[n] = nd
+                            queue.append(n)
+            return np.array(field, dtype=np.int16).reshape(h, w)
+
+
+def warmup_ai():
+    # Trigger JIT compilation up front so the first frames don't stutter
+    exits = np.zeros((1, 1), dtype=np.uint8)
+    field = np.zeros((1, 1), dtype=np.int16)
+    valid_neighbors_mask(exits, 0, 0, 0, 0, True)
+    choose_dir(0, 0, 0, 0, 0, 0, 0)
+    choose_dir_field(0, 0, 0, 0, field, 0, False)
+    pick_exit(1, 0)
+    distance_field(exits, 0, 0)
 
 
 # -----------------------------
 # Player
 # -----------------------------
 class Player:
-    def __init__(self, maze: Maze, start: Tuple[int, int]):
+    __slots__ = ('maze', 'ipos', 'dir', 'next_dir', 'speed', 'radius', 'alive', 'lives', 'score', 'sprite')
+
+    def __init__(self, maze: Maze, start: tuple[int, int]):
         self.maze = maze
-        self.pos = [float(start[0]), float(start[1])]  # grid coords
+        self.ipos = [start[0] << TILE_SHIFT, start[1] << TILE_SHIFT]  # fixed-point px
         self.dir = STOP
         self.next_dir = STOP
-        self.speed = 6.0 / TILE_SIZE  # tiles per frame
+        self.speed = TILE_SIZE // 4  # px per frame; divides TILE_SIZE so centers are hit exactly
         self.radius = TILE_SIZE // 2 - 2
         self.alive = True
         self.lives = 3
         self.score = 0
+        # Drawn through a DirtySprite member so Player itself stays slotted
+        self.sprite = pygame.sprite.DirtySprite()
+        self.sprite.image = circle_sprite(YELLOW, self.radius)
+        self.sprite.rect = self.sprite.image.get_rect(topleft=self.ipos)
 
-    def handle_input(self, keys):
-        if keys[pygame.K_UP]:
-            self.next_dir = UP
-        elif keys[pygame.K_DOWN]:
-            self.next_dir = DOWN
-        elif keys[pygame.K_LEFT]:
-            self.next_dir = LEFT
-        elif keys[pygame.K_RIGHT]:
-            self.next_dir = RIGHT
-
-    def can_move(self, direction: Tuple[int, int]) -> bool:
-        gx, gy = int(round(self.pos[0])), int(round(self.pos[1]))
+    def can_move(self, direction: tuple[int, int]) -> bool:
+        gx, gy = tile_of(self.ipos)
         nx, ny = gx + direction[0], gy + direction[1]
-        return self.maze.in_bounds(nx, ny) and self.maze.passable(nx, ny)
+        return self.maze.passable(nx, ny)
 
     def update(self):
-        # Apply next_dir at tile centers for snappy turns
-        if self.next_dir != self.dir:
-            if self._is_centered_on_tile():
-                if self.can_move(self.next_dir):
-                    self.dir = self.next_dir
-        # If current dir blocked, stop at the center
-        if not self.can_move(self.dir):
-            if self._is_centered_on_tile():
+        can_move = self.can_move
+        if self._is_centered_on_tile():
+            # Apply next_dir at tile centers for snappy turns
+            if self.next_dir != self.dir and can_move(self.next_dir):
+                self.dir = self.next_dir
+            # If current dir blocked, stop at the center
+            if not can_move(self.dir):
                 self.dir = STOP
 
         # Move
-        self.pos[0] += self.dir[0] * self.speed
-        self.pos[1] += self.dir[1] * self.speed
+        ipos = self.ipos
+        dx, dy = self.dir
+        speed = self.speed
+        ipos[0] += dx * speed
+        ipos[1] += dy * speed
         self._clamp_inside_walls()
+        if dx or dy:
+            self._sync_sprite()
+
+    def reset(self, start: tuple[int, int]):
+        self.ipos = [start[0] << TILE_SHIFT, start[1] << TILE_SHIFT]
+        self._sync_sprite()
+
+    def _sync_sprite(self):
+        # Move the sprite rect to the current position and flag it for repaint
+        sprite = self.sprite
+        sprite.rect.topleft = self.ipos
+        sprite.dirty = 1
 
     def _is_centered_on_tile(self) -> bool:
-        return abs(self.pos[0] - round(self.pos[0])) < 0.1 and abs(self.pos[1] - round(self.pos[1])) < 0.1
+        return (self.ipos[0] & TILE_MASK) == 0 and (self.ipos[1] & TILE_MASK) == 0
 
     def _clamp_inside_walls(self):
         # Prevent slipping into walls by clamping to tile center if near
         if not self._is_centered_on_tile():
             return
-        gx, gy = int(round(self.pos[0])), int(round(self.pos[1]))
-        if (gx, gy) in self.maze.walls:
-            self.pos = [float(gx), float(gy)]
+        gx, gy = tile_of(self.ipos)
+        if not self.maze.passable(gx, gy):
+            self.ipos = [gx << TILE_SHIFT, gy << TILE_SHIFT]
 
-    def eat_pellets(self) -> Tuple[int, int]:
+    def eat_pellets(self) -> tuple[int, int]:
         # returns (pellets_eaten, power_pellets_eaten)
-        gx, gy = int(round(self.pos[0])), int(round(self.pos[1]))
-        eaten = 0
-        power = 0
-        if (gx, gy) in self.maze.pellets:
-            self.maze.pellets.remove((gx, gy))
+        gx, gy = tile_of(self.ipos)
+        if not self.maze.in_bounds(gx, gy):
+            return 0, 0
+        item = self.maze.item_rows[gy][gx]
+        if item == ITEM_NONE:
+            return 0, 0
+        self.maze.item_rows[gy][gx] = ITEM_NONE
+        self.maze.item_grid[gy, gx] = ITEM_NONE
+        self.maze.clear_pellet_px(gx, gy)
+        self.maze.remaining -= 1
+        if item == ITEM_PELLET:
+            self.maze.pellet_count -= 1
             self.score += 10
-            eaten += 1
-        if (gx, gy) in self.maze.power_pellets:
-            self.maze.power_pellets.remove((gx, gy))
-            self.score += 50
-            power += 1
-        return eaten, power
-
-    def draw(self, screen: pygame.Surface):
-        px, py = grid_to_px((self.pos[0], self.pos[1]))
-        pygame.draw.circle(screen, YELLOW, (px, py), self.radius)
+            return 1, 0
+        self.maze.power_count -= 1
+        self.score += 50
+        return 0, 1
 
 
 # -----------------------------
 # Ghosts
 # -----------------------------
 class Ghost:
-    def __init__(self, maze: Maze, start: Tuple[int, int], color: Tuple[int, int, int]):
+    __slots__ = ('maze', 'start', 'ipos', 'dir', 'speed_normal', 'speed_vulnerable', 'speed_eaten',
+                 'state', 'color', 'radius', 'last_valid_dir', 'images', 'sprite')
+
+    def __init__(self, maze: Maze, start: tuple[int, int], color: tuple[int, int, int]):
         self.maze = maze
         self.start = start
-        self.pos = [float(start[0]), float(start[1])]  # grid
-        self.dir = random.choice(ALL_DIRS)
-        self.speed_normal = 5.0 / TILE_SIZE
-        self.speed_vulnerable = 3.5 / TILE_SIZE
-        self.speed_eaten = 7.0 / TILE_SIZE
+        self.ipos = [start[0] << TILE_SHIFT, start[1] << TILE_SHIFT]  # fixed-point px
+        self.dir = ALL_DIRS[RNG.randbelow(4)]
+        # px per frame; update() stops at every tile center on the way
+        self.speed_normal = 7
+        self.speed_vulnerable = 5
+        self.speed_eaten = 9
         self.state = GHOST_NORMAL
         self.color = color
         self.radius = TILE_SIZE // 2 - 3
         self.last_valid_dir = self.dir
+        # One pre-rendered image per state
+        self.images = {
+            GHOST_NORMAL: circle_sprite(color, self.radius),
+            GHOST_VULNERABLE: circle_sprite(GREY, self.radius),
+            GHOST_EATEN: circle_sprite(WHITE, self.radius),
+        }
+        # Drawn through a DirtySprite member so Ghost itself stays slotted
+        self.sprite = pygame.sprite.DirtySprite()
+        self.sprite.image = self.images[self.state]
+        self.sprite.rect = self.sprite.image.get_rect(topleft=self.ipos)
 
     def reset(self):
-        self.pos = [float(self.start[0]), float(self.start[1])]
-        self.dir = random.choice(ALL_DIRS)
+        self.ipos = [self.start[0] << TILE_SHIFT, self.start[1] << TILE_SHIFT]
+        self.dir = ALL_DIRS[RNG.randbelow(4)]
         self.state = GHOST_NORMAL
+        self._sync_sprite()
 
     def set_vulnerable(self):
         if self.state != GHOST_EATEN:
@@ -231,31 +509,58 @@ class Ghost:
     def set_eaten(self):
         self.state = GHOST_EATEN
 
-    def update(self, player_tile: Tuple[int, int]):
-        # Decide direction at intersections or when blocked
-        if self._at_center():
-            choices = self._valid_neighbors(avoid_reverse=True)
-            if not choices:
-                choices = self._valid_neighbors(avoid_reverse=False)
-            target = self._target_tile(player_tile)
-            self.dir = self._choose_dir(choices, target)
-
-        # Move
-        speed = self._current_speed()
-        self.pos[0] += self.dir[0] * speed
-        self.pos[1] += self.dir[1] * speed
-        
+    def update(self, player_tile: tuple[int, int], dist_field: np.ndarray | None = None):
+        # Move in steps that never overshoot a tile center, deciding at each one
+        ipos = self.ipos
+        at_center = self._at_center
+        px_to_next_center = self._px_to_next_center
+        remaining = self._current_speed()
+        while remaining > 0:
+            if at_center():
+                self._decide(player_tile, dist_field)
+            step = min(remaining, px_to_next_center())
+            dx, dy = self.dir
+            ipos[0] += dx * step
+            ipos[1] += dy * step
+            remaining -= step
+        self._sync_sprite()
+
+    def _sync_sprite(self):
+        # Match image to state and rect to position, and flag for repaint
+        sprite = self.sprite
+        sprite.image = self.images[self.state]
+        sprite.rect.topleft = self.ipos
+        sprite.dirty = 1
+
+    def _decide(self, player_tile: tuple[int, int], dist_field: np.ndarray | None):
         # If eaten and reached the house tile center, revert to normal
-        if self.state == GHOST_EATEN and self._at_center():
-            gx, gy = int(round(self.pos[0])), int(round(self.pos[1]))
+        if self.state == GHOST_EATEN:
+            gx, gy = tile_of(self.ipos)
             if (gx, gy) == self.maze.house_pos:
                 self.state = GHOST_NORMAL
                 # pick a new direction away from reversing to leave the house
-                choices = self._valid_neighbors(avoid_reverse=False)
-                if choices:
-                    self.dir = random.choice(choices)
+                mask = self._valid_mask(avoid_reverse=False)
+                if mask:
+                    self.dir = pick_exit(mask, RNG.randbelow(POPCOUNT4[mask]))
+                    return
 
-    def _current_speed(self) -> float:
+        # Decide direction at intersections or when blocked
+        mask = self._valid_mask(avoid_reverse=True)
+        if not mask:
+            mask = self._valid_mask(avoid_reverse=False)
+        # The target tile only matters for the greedy fallback without a field
+        target = self._target_tile(player_tile) if dist_field is None else None
+        self.dir = self._choose_dir(mask, target, dist_field)
+
+    def _px_to_next_center(self) -> int:
+        # Pixels along the current direction until the next tile center
+        dx, dy = self.dir
+        off = (self.ipos[0] if dx else self.ipos[1]) & TILE_MASK
+        if off == 0:
+            return TILE_SIZE
+        return TILE_SIZE - off if dx > 0 or dy > 0 else off
+
+    def _current_speed(self) -> int:
         if self.state == GHOST_VULNERABLE:
             return self.speed_vulnerable
         if self.state == GHOST_EATEN:
@@ -263,20 +568,13 @@ class Ghost:
         return self.speed_normal
 
     def _at_center(self) -> bool:
-        return abs(self.pos[0] - round(self.pos[0])) < 0.1 and abs(self.pos[1] - round(self.pos[1])) < 0.1
+        return (self.ipos[0] & TILE_MASK) == 0 and (self.ipos[1] & TILE_MASK) == 0
 
-    def _valid_neighbors(self, avoid_reverse=True) -> List[Tuple[int, int]]:
-        gx, gy = int(round(self.pos[0])), int(round(self.pos[1]))
-        choices = []
-        for d in ALL_DIRS:
-            if avoid_reverse and (d[0] == -self.dir[0] and d[1] == -self.dir[1]):
-                continue
-            nx, ny = gx + d[0], gy + d[1]
-            if self.maze.in_bounds(nx, ny) and self.maze.passable(nx, ny):
-                choices.append(d)
-        return choices
+    def _valid_mask(self, avoid_reverse=True) -> int:
+        gx, gy = tile_of(self.ipos)
+        return valid_neighbors_mask(self.maze.exits, gx, gy, self.dir[0], self.dir[1], avoid_reverse)
 
-    def _target_tile(self, player_tile: Tuple[int, int]) -> Tuple[int, int]:
+    def _target_tile(self, player_tile: tuple[int, int]) -> tuple[int, int]:
         # Default behavior: go to house if eaten, else chase player
         if self.state == GHOST_EATEN:
             return self.maze.house_pos
@@ -288,42 +586,34 @@ class Ghost:
             return (far_x, far_y)
         return player_tile
 
-    def _choose_dir(self, choices: List[Tuple[int, int]], target: Tuple[int, int]) -> Tuple[int, int]:
-        # Greedy choose direction minimizing Manhattan distance to target
-        if not choices:
+    def _choose_dir(self, mask: int, target: tuple[int, int] | None,
+                    dist_field: np.ndarray | None = None) -> tuple[int, int]:
+        # Follow the BFS distance field when available (house field when eaten;
+        # away from the player when vulnerable), else greedy Manhattan to target
+        if not mask:
             return self.dir
-        gx, gy = int(round(self.pos[0])), int(round(self.pos[1]))
-        best = choices[0]
-        best_dist = math.inf
-        for d in choices:
-            nx, ny = gx + d[0], gy + d[1]
-            dist = manhattan((nx, ny), target)
-            if dist < best_dist:
-                best_dist = dist
-                best = d
-        return best
-
-    def draw(self, screen: pygame.Surface):
-        px, py = grid_to_px((self.pos[0], self.pos[1]))
-        if self.state == GHOST_VULNERABLE:
-            color = GREY
-        elif self.state == GHOST_EATEN:
-            color = WHITE
-        else:
-            color = self.color
-        pygame.draw.circle(screen, color, (px, py), self.radius)
+        gx, gy = tile_of(self.ipos)
+        if self.state == GHOST_EATEN:
+            dist_field = self.maze.house_field
+        if dist_field is not None:
+            return choose_dir_field(gx, gy, self.dir[0], self.dir[1], dist_field, mask,
+                                    self.state == GHOST_VULNERABLE)
+        return choose_dir(gx, gy, self.dir[0], self.dir[1], target[0], target[1], mask)
 
 
 class RandomGhost(Ghost):
-    def _choose_dir(self, choices: List[Tuple[int, int]], target: Tuple[int, int]) -> Tuple[int, int]:
-        # Pick random direction from choices
-        if not choices:
+    __slots__ = ()
+
+    def _choose_dir(self, mask: int, target: tuple[int, int] | None,
+                    dist_field: np.ndarray | None = None) -> tuple[int, int]:
+        # Pick random direction from the valid exits
+        if not mask:
             return self.dir
-        return random.choice(choices)
+        return pick_exit(mask, RNG.randbelow(POPCOUNT4[mask]))
 
 
 class ChaserGhost(Ghost):
-    pass  # Uses base Ghost greedy chasing
+    __slots__ = ()  # Uses base Ghost chasing
 
 
 # -----------------------------
@@ -335,13 +625,15 @@ class Game:
         pygame.display.set_caption("Pacman - OOP Clone")
         self.maze = self._build_maze()
         self.screen = pygame.display.set_mode((self.maze.width * TILE_SIZE, self.maze.height * TILE_SIZE + 40))
+        self.maze.prerender()
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont("arial", 20)
+        warmup_ai()
 
         self.player = Player(self.maze, self.maze.player_start)
         # Identify ghost spawns: first chaser, second random (if two exist)
         colors = [RED, CYAN, ORANGE, PINK]
-        self.ghosts: List[Ghost] = []
+        self.ghosts: list[Ghost] = []
         starts = self.maze.ghost_starts[:]
         if len(starts) >= 1:
             self.ghosts.append(ChaserGhost(self.maze, starts[0], colors[0]))
@@ -351,6 +643,16 @@ class Game:
         for i in range(2, len(starts)):
             self.ghosts.append(RandomGhost(self.maze, starts[i], colors[i % len(colors)]))
 
+        # Static background (maze + remaining pellets + blank HUD) for dirty-rect repaint
+        self.background = pygame.Surface(self.screen.get_size()).convert()
+        self.background.fill(BLACK)
+        self.maze.draw(self.background)
+        self.sprites = pygame.sprite.LayeredDirty(self.player.sprite, *(g.sprite for g in self.ghosts))
+        self.sprites.clear(self.screen, self.background)
+
+        self.dist_tile: tuple[int, int] | None = None
+        self.dist_to_player: np.ndarray | None = None
+
         self.power_timer: int = 0  # frames remaining for vulnerability
         self.power_duration_sec = 7
 
@@ -388,8 +690,9 @@ class Game:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
-        keys = pygame.key.get_pressed()
-        self.player.handle_input(keys)
+            elif event.type == pygame.KEYDOWN and event.key in DIR_MAP:
+                # next_dir persists, so held keys need no per-frame polling
+                self.player.next_dir = DIR_MAP[event.key]
 
     def _update(self):
         self.player.update()
@@ -400,9 +703,13 @@ class Game:
                 g.set_vulnerable()
 
         # Update ghosts
-        player_tile = (int(round(self.player.pos[0])), int(round(self.player.pos[1])))
+        player_tile = tile_of(self.player.ipos)
+        # Shared BFS field to the player, only rebuilt when the player changes tile
+        if player_tile != self.dist_tile:
+            self.dist_tile = player_tile
+            self.dist_to_player = self.maze.compute_distance_field(player_tile)
         for g in self.ghosts:
-            g.update(player_tile)
+            g.update(player_tile, self.dist_to_player)
 
         # Power timer countdown
         if self.power_timer > 0:
@@ -415,17 +722,23 @@ class Game:
         # Collisions
         self._check_collisions()
 
-        # Win condition
-        if len(self.maze.pellets) == 0 and len(self.maze.power_pellets) == 0:
+        # Win condition; only possible on a frame where something was eaten
+        if (pel or power) and self.maze.remaining == 0:
             self.win = True
             self.running = False
 
     def _check_collisions(self):
-        pp = grid_to_px((self.player.pos[0], self.player.pos[1]))
+        shift, half, dist2 = TILE_SHIFT, TILE_HALF, COLLIDE_DIST2
+        ppx, ppy = self.player.ipos
+        ptx, pty = (ppx + half) >> shift, (ppy + half) >> shift
         for g in self.ghosts:
-            gp = grid_to_px((g.pos[0], g.pos[1]))
-            dist = math.hypot(pp[0] - gp[0], pp[1] - gp[1])
-            if dist < TILE_SIZE * 0.6:
+            gpx, gpy = g.ipos
+            # Ghosts more than one tile away on either axis can't be touching
+            if abs(((gpx + half) >> shift) - ptx) > 1 or abs(((gpy + half) >> shift) - pty) > 1:
+                continue
+            dx = ppx - gpx
+            dy = ppy - gpy
+            if dx * dx + dy * dy < dist2:
                 if g.state == GHOST_VULNERABLE:
                     g.set_eaten()
                     self.player.score += 200
@@ -439,7 +752,7 @@ class Game:
                         self.running = False
                     else:
                         # Reset positions
-                        self.player.pos = [float(self.maze.player_start[0]), float(self.maze.player_start[1])]
+                        self.player.reset(self.maze.player_start)
                         for gg in self.ghosts:
                             gg.reset()
                         self.power_timer = 0
@@ -455,21 +768,38 @@ class Game:
             text += "   YOU WIN!"
         surf = self.font.render(text, True, WHITE)
         self.screen.blit(surf, (10, self.maze.height * TILE_SIZE + 10))
-
-    def draw(self):
-        self.maze.draw(self.screen)
-        self.player.draw(self.screen)
-        for g in self.ghosts:
-            g.draw(self.screen)
-        self._draw_hud()
+        return hud_rect
+
+    def draw(self) -> list[pygame.Rect]:
+        # Returns the screen rects changed this frame, for pygame.display.update
+        maze = self.maze
+        for rect in maze.dirty_rects:
+            self.background.blit(maze.bg_surface, rect, rect)
+            self.sprites.repaint_rect(rect)
+        maze.dirty_rects.clear()
+        rects = self.sprites.draw(self.screen)
+        rects.append(self._draw_hud())
+        return rects
 
     def run(self):
+        # Fixed-timestep loop: simulate at FPS, render once per outer iteration
+        acc = 0.0
+        last = time.monotonic()
         while self.running:
-            self.clock.tick(FPS)
+            self.clock.tick(MAX_RENDER_FPS)
+            now = time.monotonic()
+            acc += now - last
+            last = now
             self._handle_events()
-            self._update()
-            self.draw()
-            pygame.display.flip()
+            steps = 0
+            while acc >= STEP and self.running:
+                self._update()
+                acc -= STEP
+                steps += 1
+                if steps >= MAX_STEPS_PER_FRAME:
+                    acc = 0.0
+                    break
+            pygame.display.update(self.draw())
 
         # End screen brief
         end_text = "YOU WIN!" if self.win else "GAME OVER"
@@ -0,0 +1,99 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+# Ahead-of-time compiled ghost AI kernels for pacman.py.
+# Same names, arguments and results as the numba/Python kernels there; pacman.py
+# uses these instead when the prebuilt module can be imported.
+# Build in place with:  python setup.py build_ext --inplace
+
+import numpy as np
+
+# Same order as ALL_DIRS / EXIT_BITS in pacman.py
+cdef int[4] DIR_DX = [0, 0, -1, 1]
+cdef int[4] DIR_DY = [-1, 1, 0, 0]
+
+
+cpdef int valid_neighbors_mask(const unsigned char[:, :] exits, int gx, int gy,
+                               int cur_dx, int cur_dy, bint avoid_reverse):
+    # Exit bitmask at (gx, gy), optionally without the bit that reverses (cur_dx, cur_dy)
+    cdef int i, mask
+    if gy < 0 or gy >= exits.shape[0] or gx < 0 or gx >= exits.shape[1]:
+        return 0
+    mask = exits[gy, gx]
+    if avoid_reverse:
+        for i in range(4):
+            if DIR_DX[i] == -cur_dx and DIR_DY[i] == -cur_dy:
+                mask &= ~(1 << i)
+    return mask
+
+
+cpdef tuple choose_dir(int gx, int gy, int cur_dx, int cur_dy, int tgt_x, int tgt_y, int exits_mask):
+    # Greedy choose the direction in exits_mask minimizing Manhattan distance to target
+    cdef int i, dist
+    cdef int best_dx = cur_dx, best_dy = cur_dy, best_dist = -1
+    for i in range(4):
+        if exits_mask & (1 << i):
+            dist = abs(gx + DIR_DX[i] - tgt_x) + abs(gy + DIR_DY[i] - tgt_y)
+            if best_dist < 0 or dist < best_dist:
+                best_dist = dist
+                best_dx = DIR_DX[i]
+                best_dy = DIR_DY[i]
+    return best_dx, best_dy
+
+
+cpdef tuple choose_dir_field(int gx, int gy, int cur_dx, int cur_dy, const short[:, :] field,
+                             int exits_mask, bint maximize):
+    # Choose the direction in exits_mask with the lowest (or highest) distance field value
+    cdef int i, dist
+    cdef int best_dx = cur_dx, best_dy = cur_dy, best_dist = 0
+    cdef bint found = False
+    for i in range(4):
+        if exits_mask & (1 << i):
+            dist = field[gy + DIR_DY[i], gx + DIR_DX[i]]
+            if not found or (dist > best_dist if maximize else dist < best_dist):
+                found = True
+                best_dist = dist
+                best_dx = DIR_DX[i]
+                best_dy = DIR_DY[i]
+    return best_dx, best_dy
+
+
+cpdef tuple pick_exit(int exits_mask, int k):
+    # Direction of the k-th set bit in exits_mask (no list allocation)
+    cdef int i
+    for i in range(4):
+        if exits_mask & (1 << i):
+            if k == 0:
+                return DIR_DX[i], DIR_DY[i]
+            k -= 1
+    return 0, 0
+
+
+cpdef object distance_field(const unsigned char[:, :] exits, int tx, int ty):
+    # BFS step distance to (tx, ty) along the exit masks; int16 max (DIST_UNREACHABLE) elsewhere
+    cdef Py_ssize_t h = exits.shape[0], w = exits.shape[1]
+    field_arr = np.full((h, w), np.iinfo(np.int16).max, dtype=np.int16)
+    if ty < 0 or ty >= h or tx < 0 or tx >= w:
+        return field_arr
+    cdef short[:, :] field = field_arr
+    cdef short unreachable = field[ty, tx]
+    # Flat y * w + x queue; every tile is enqueued at most once
+    cdef int[:] queue = np.empty(h * w, dtype=np.intc)
+    cdef int head = 0, tail = 1, cell, x, y, nx, ny, i, mask
+    cdef short nd
+    field[ty, tx] = 0
+    queue[0] = ty * w + tx
+    while head < tail:
+        cell = queue[head]
+        head += 1
+        y = cell // w
+        x = cell % w
+        mask = exits[y, x]
+        nd = field[y, x] + 1
+        for i in range(4):
+            if mask & (1 << i):
+                nx = x + DIR_DX[i]
+                ny = y + DIR_DY[i]
+                if field[ny, nx] == unreachable:
+                    field[ny, nx] = nd
+                    queue[tail] = ny * w + nx
+                    tail += 1
+    return field_arr
@@ -0,0 +1,9 @@
+# Builds the optional Cython ghost AI kernels in place:
+#     python setup.py build_ext --inplace
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="pacman-ai",
+    ext_modules=cythonize("pacman_ai.pyx", language_level=3),
+)